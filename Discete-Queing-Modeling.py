@@ -1,3 +1,5 @@
+import numpy as np
+
 def fuzzify_rssi(rssi):
     if rssi >= -60:
         return "High"
@@ -30,6 +32,23 @@ def fuzzify_throughput(tp):
     else:
         return "Low"
 
+# Vectorized variants for scoring whole arrays/Series in one pass
+def fuzzify_rssi_vec(rssi):
+    rssi = np.asarray(rssi)
+    return np.select([rssi >= -60, rssi >= -80], ["High", "Medium"], default="Low")
+
+def fuzzify_latency_vec(latency):
+    latency = np.asarray(latency)
+    return np.select([latency <= 50, latency <= 150], ["Good", "Average"], default="Poor")
+
+def fuzzify_packet_loss_vec(loss):
+    loss = np.asarray(loss)
+    return np.select([loss < 1, loss < 5], ["Low", "Medium"], default="High")
+
+def fuzzify_throughput_vec(tp):
+    tp = np.asarray(tp)
+    return np.select([tp >= 100, tp >= 30], ["High", "Medium"], default="Low")
+
 def evaluate_qos(rssi, latency, loss, throughput):
     rssi_level = fuzzify_rssi(rssi)
     latency_level = fuzzify_latency(latency)
@@ -46,4 +65,14 @@ def evaluate_qos(rssi, latency, loss, throughput):
     else:
         return "Medium"
 
+def evaluate_qos_vec(rssi, latency, loss, throughput):
+    rssi_level = fuzzify_rssi_vec(rssi)
+    latency_level = fuzzify_latency_vec(latency)
+    loss_level = fuzzify_packet_loss_vec(loss)
+    tp_level = fuzzify_throughput_vec(throughput)
+
+    high = (rssi_level == "High") & (latency_level == "Good") & (loss_level == "Low") & (tp_level == "High")
+    low = (latency_level == "Poor") | (loss_level == "High")
+    return np.select([high, low], ["High", "Low"], default="Medium")
+
 print(evaluate_qos(1212.2,-66.8,16.37,11))
\ No newline at end of file
@@ -1,9 +1,475 @@
 import networkx as nx
+import numpy as np
 import random
 import math
 import json
+import multiprocessing
+import os
+import time
+import threading
+from heapq import heappush, heappop
+from concurrent.futures import ProcessPoolExecutor
+from functools import wraps
+from itertools import combinations, islice
+from scipy.sparse.csgraph import connected_components
+# Also selects numba's threading layer for the kernels below
 from network_topology import NetworkTopology
 
+try:
+    import networkit as nk
+except ImportError:
+    nk = None
+
+try:
+    from numba import njit, prange, get_num_threads
+except ImportError:
+    njit = None
+
+# Number of shortest alternative paths reported per node pair
+MAX_ALTERNATIVE_PATHS = 5
+
+# Above this many nodes, node betweenness is estimated from sampled sources
+APPROX_BETWEENNESS_MIN_NODES = 5000
+APPROX_BETWEENNESS_SAMPLES = 512
+
+# Graphs with at least this many nodes spread the per-source shortest-path
+# work across processes; below it, process start-up costs more than it saves
+PARALLEL_MIN_NODES = 1000
+
+
+def _index_graph(G, weight):
+    """
+    Relabel G to integers 0..n-1, returning the node labels in index order
+    and an adjacency list of (neighbor index, edge weight) pairs
+    """
+    nodes = list(G)
+    index = {node: i for i, node in enumerate(nodes)}
+    adj = [
+        [
+            (index[w], edgedata.get(weight, 1) if weight else 1)
+            for w, edgedata in G._adj[v].items()
+        ]
+        for v in nodes
+    ]
+    return nodes, adj
+
+
+def _accumulate_sources(adj, sources, fused=True):
+    """
+    Brandes' algorithm over the given sources on an integer adjacency list.
+    Per-source state lives in flat lists allocated once and reset only for
+    the nodes each source touched. Returns the largest hop eccentricity
+    (0 unless fused) and the unnormalized betweenness score of every node.
+    
+    When fused, each source also runs a BFS for its hop eccentricity, and
+    NetworkXError is raised as soon as a source cannot reach every node
+    """
+    n = len(adj)
+    inf = float('inf')
+    scores = [0.0] * n
+    diameter = 0
+    
+    hops = [-1] * n
+    sigma = [0.0] * n
+    seen = [inf] * n
+    settled = [False] * n
+    delta = [0.0] * n
+    preds = [None] * n
+    
+    for s in sources:
+        if fused:
+            # Hop distances (BFS), as used by nx.diameter
+            hops[s] = 0
+            visited = [s]
+            for v in visited:
+                next_hop = hops[v] + 1
+                for w, _ in adj[v]:
+                    if hops[w] < 0:
+                        hops[w] = next_hop
+                        visited.append(w)
+            if len(visited) < n:
+                raise nx.NetworkXError(
+                    "Found infinite path length because the graph is not connected"
+                )
+            diameter = max(diameter, hops[visited[-1]])
+            for v in visited:
+                hops[v] = -1
+        
+        # Weighted shortest paths (Dijkstra) with path counts and predecessors
+        order = []
+        touched = [s]
+        sigma[s] = 1.0
+        seen[s] = 0
+        preds[s] = []
+        heap = [(0, s)]
+        while heap:
+            d, v = heappop(heap)
+            if settled[v]:
+                continue
+            settled[v] = True
+            order.append(v)
+            sigma_v = sigma[v]
+            for w, weight in adj[v]:
+                vw_dist = d + weight
+                if not settled[w] and vw_dist < seen[w]:
+                    if seen[w] == inf:
+                        touched.append(w)
+                    seen[w] = vw_dist
+                    heappush(heap, (vw_dist, w))
+                    sigma[w] = sigma_v
+                    preds[w] = [v]
+                elif vw_dist == seen[w]:
+                    sigma[w] += sigma_v
+                    preds[w].append(v)
+        
+        # Accumulate dependencies in order of non-increasing distance
+        for w in reversed(order):
+            coeff = (1 + delta[w]) / sigma[w]
+            for v in preds[w]:
+                delta[v] += sigma[v] * coeff
+            if w != s:
+                scores[w] += delta[w]
+        
+        for v in touched:
+            sigma[v] = 0.0
+            seen[v] = inf
+            settled[v] = False
+            delta[v] = 0.0
+    
+    return diameter, scores
+
+
+def _rescale_betweenness(scores, n):
+    """
+    Normalize summed dependencies the way nx.betweenness_centrality does
+    for undirected graphs
+    """
+    if n > 2:
+        scale = 1 / ((n - 1) * (n - 2))
+        scores = [score * scale for score in scores]
+    return scores
+
+
+def _to_csr_arrays(adj):
+    """
+    Flatten an integer adjacency list into CSR indptr/indices/weights arrays
+    """
+    degrees = [len(neighbors) for neighbors in adj]
+    indptr = np.zeros(len(adj) + 1, dtype=np.int64)
+    np.cumsum(degrees, out=indptr[1:])
+    indices = np.array([w for neighbors in adj for w, _ in neighbors], dtype=np.int64)
+    weights = np.array([wt for neighbors in adj for _, wt in neighbors], dtype=np.float64)
+    return indptr, indices, weights
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _brandes_csr(indptr, indices, weights, fused, n_chunks):
+        """
+        Native counterpart of _accumulate_sources over all sources of a CSR
+        graph. Sources are split into n_chunks interleaved groups run in
+        parallel, each with its own state arrays and partial scores.
+        Returns (scores, largest hop eccentricity, fewest nodes reached)
+        """
+        n = indptr.shape[0] - 1
+        partial = np.zeros((n_chunks, n))
+        eccentricity = np.zeros(n_chunks, dtype=np.int64)
+        min_reached = np.full(n_chunks, n, dtype=np.int64)
+        
+        for c in prange(n_chunks):
+            hops = np.full(n, -1, dtype=np.int64)
+            visited = np.empty(n, dtype=np.int64)
+            dist = np.full(n, np.inf)
+            sigma = np.zeros(n)
+            delta = np.zeros(n)
+            settled = np.zeros(n, dtype=np.bool_)
+            order = np.empty(n, dtype=np.int64)
+            
+            for s in range(c, n, n_chunks):
+                if fused:
+                    # Hop distances (BFS), as used by nx.diameter
+                    hops[s] = 0
+                    visited[0] = s
+                    head = 0
+                    tail = 1
+                    while head < tail:
+                        v = visited[head]
+                        head += 1
+                        for k in range(indptr[v], indptr[v + 1]):
+                            w = indices[k]
+                            if hops[w] < 0:
+                                hops[w] = hops[v] + 1
+                                visited[tail] = w
+                                tail += 1
+                    eccentricity[c] = max(eccentricity[c], hops[visited[tail - 1]])
+                    min_reached[c] = min(min_reached[c], tail)
+                    for i in range(tail):
+                        hops[visited[i]] = -1
+                
+                # Weighted shortest paths (Dijkstra) with path counts
+                dist[s] = 0.0
+                sigma[s] = 1.0
+                count = 0
+                heap = [(0.0, s)]
+                while len(heap) > 0:
+                    d, v = heappop(heap)
+                    if settled[v]:
+                        continue
+                    settled[v] = True
+                    order[count] = v
+                    count += 1
+                    for k in range(indptr[v], indptr[v + 1]):
+                        w = indices[k]
+                        vw_dist = d + weights[k]
+                        if not settled[w] and vw_dist < dist[w]:
+                            dist[w] = vw_dist
+                            sigma[w] = sigma[v]
+                            heappush(heap, (vw_dist, w))
+                        elif vw_dist == dist[w]:
+                            sigma[w] += sigma[v]
+                
+                # Accumulate dependencies; predecessors are the neighbors
+                # lying exactly one edge short of w's distance
+                for i in range(count - 1, -1, -1):
+                    w = order[i]
+                    coeff = (1 + delta[w]) / sigma[w]
+                    for k in range(indptr[w], indptr[w + 1]):
+                        v = indices[k]
+                        if dist[v] + weights[k] == dist[w]:
+                            delta[v] += sigma[v] * coeff
+                    if w != s:
+                        partial[c, w] += delta[w]
+                
+                for i in range(count):
+                    v = order[i]
+                    dist[v] = np.inf
+                    sigma[v] = 0.0
+                    delta[v] = 0.0
+                    settled[v] = False
+        
+        return partial.sum(axis=0), eccentricity.max(), min_reached.min()
+
+
+def _native_path_statistics(adj, fused):
+    """
+    Run _brandes_csr over every source, returning (diameter, scores) like
+    _accumulate_sources does
+    """
+    n = len(adj)
+    indptr, indices, weights = _to_csr_arrays(adj)
+    scores, diameter, min_reached = _brandes_csr(
+        indptr, indices, weights, fused, max(1, min(get_num_threads(), n))
+    )
+    if fused and min_reached < n:
+        raise nx.NetworkXError(
+            "Found infinite path length because the graph is not connected"
+        )
+    return int(diameter), scores.tolist()
+
+
+def _fast_betweenness(G, weight='weight'):
+    """
+    Normalized node betweenness centrality using integer-indexed lists
+    instead of per-node dicts (or the Numba kernel when available); a
+    drop-in for nx.betweenness_centrality
+    """
+    nodes, adj = _index_graph(G, weight)
+    if njit is not None and nodes:
+        _, scores = _native_path_statistics(adj, fused=False)
+    else:
+        _, scores = _accumulate_sources(adj, range(len(nodes)), fused=False)
+    return dict(zip(nodes, _rescale_betweenness(scores, len(nodes))))
+
+
+# Adjacency handed to each worker process once, instead of with every task
+_worker_adj = None
+
+# Forking a threaded server can copy a lock held by another thread into the
+# child, so path workers start from a clean interpreter instead
+_worker_context = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+
+def _init_path_worker(adj):
+    global _worker_adj
+    _worker_adj = adj
+
+
+def _accumulate_worker_sources(sources):
+    return _accumulate_sources(_worker_adj, sources)
+
+
+def _path_statistics(G, weight='weight'):
+    """
+    Fused shortest-path analysis: one loop over sources yields the
+    connectedness, hop diameter and normalized node betweenness of G
+    instead of separate nx.is_connected, nx.diameter and
+    nx.betweenness_centrality traversals. Sources are independent, so
+    they run in parallel threads of the Numba kernel when it is available,
+    and large graphs otherwise split them across worker processes
+    """
+    nodes, adj = _index_graph(G, weight)
+    n = len(nodes)
+    sources = list(range(n))
+    workers = min(os.cpu_count() or 1, n)
+    
+    if njit is not None and n:
+        partials = [_native_path_statistics(adj, fused=True)]
+    elif n >= PARALLEL_MIN_NODES and workers > 1:
+        # Interleave sources so every worker gets a similar mix
+        chunks = [sources[i::workers] for i in range(workers)]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=_worker_context,
+            initializer=_init_path_worker,
+            initargs=(adj,)
+        ) as pool:
+            partials = list(pool.map(_accumulate_worker_sources, chunks))
+    else:
+        partials = [_accumulate_sources(adj, sources)]
+    
+    diameter = max(partial_diameter for partial_diameter, _ in partials)
+    scores = [sum(column) for column in zip(*(partial for _, partial in partials))]
+    
+    return {
+        'is_connected': True,
+        'diameter': diameter,
+        'betweenness': dict(zip(nodes, _rescale_betweenness(scores, n)))
+    }
+
+
+# Reports are reused for this many seconds while the topology is unchanged
+REPORT_CACHE_TTL = 30
+# Expired reports are kept this many seconds longer, so a caller can serve
+# one while a fresh report is computed
+REPORT_STALE_GRACE = 300
+
+_report_cache = {}
+_report_cache_lock = threading.Lock()
+# One lock per cache key, so concurrent misses compute a report only once
+_report_key_locks = {}
+
+
+def _graph_fingerprint(topology):
+    """
+    Identify the current state of a topology's graph: its version counter
+    plus a hash of the weighted edge set, to also catch direct edits of G
+    """
+    G = topology.G
+    return (
+        getattr(topology, 'version', 0),
+        G.number_of_nodes(),
+        G.number_of_edges(),
+        hash(frozenset(G.edges(data='weight')))
+    )
+
+
+def _cached_report(method):
+    """
+    Memoize an AdvancedNetworkOptimization method by graph fingerprint
+    and arguments, expiring entries after REPORT_CACHE_TTL seconds.
+    Callers that miss at the same time wait for a single computation.
+    The wrapper's peek(self, *args) returns (report, is_fresh) without
+    computing anything, or None when nothing usable is cached
+    """
+    def key_lock_for(key):
+        with _report_cache_lock:
+            return _report_key_locks.setdefault(key, threading.Lock())
+    
+    @wraps(method)
+    def wrapper(self, *args):
+        key = (method.__name__, args, _graph_fingerprint(self.topology))
+        with _report_cache_lock:
+            entry = _report_cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] < REPORT_CACHE_TTL:
+                return entry[1]
+        
+        with key_lock_for(key):
+            # Another caller may have filled the entry while we waited
+            with _report_cache_lock:
+                entry = _report_cache.get(key)
+                if entry is not None and time.monotonic() - entry[0] < REPORT_CACHE_TTL:
+                    return entry[1]
+            
+            report = method(self, *args)
+            
+            now = time.monotonic()
+            with _report_cache_lock:
+                # Drop long-expired entries so old fingerprints do not accumulate
+                for stale_key in [k for k, (ts, _) in _report_cache.items()
+                                  if now - ts >= REPORT_CACHE_TTL + REPORT_STALE_GRACE]:
+                    del _report_cache[stale_key]
+                    _report_key_locks.pop(stale_key, None)
+                _report_cache[key] = (now, report)
+        return report
+    
+    def peek(self, *args):
+        key = (method.__name__, args, _graph_fingerprint(self.topology))
+        with _report_cache_lock:
+            entry = _report_cache.get(key)
+        if entry is None:
+            return None
+        age = time.monotonic() - entry[0]
+        if age >= REPORT_CACHE_TTL + REPORT_STALE_GRACE:
+            return None
+        return entry[1], age < REPORT_CACHE_TTL
+    
+    wrapper.peek = peek
+    return wrapper
+
+
+def _to_networkit(G, weight):
+    """
+    Convert a networkx graph to NetworKit, returning the graph and a
+    node label -> NetworKit index mapping
+    """
+    G_nk = nk.nxadapter.nx2nk(G, weightAttr=weight)
+    index = {node: i for i, node in enumerate(G.nodes())}
+    return G_nk, index
+
+
+def _node_betweenness(G, weight='weight'):
+    """
+    Normalized node betweenness centrality, computed by NetworKit's
+    parallel C++ Brandes when available and _fast_betweenness otherwise
+    """
+    n = G.number_of_nodes()
+    if nk is None or n <= 2:
+        return _fast_betweenness(G, weight=weight)
+    
+    G_nk, index = _to_networkit(G, weight)
+    if n >= APPROX_BETWEENNESS_MIN_NODES:
+        algo = nk.centrality.EstimateBetweenness(
+            G_nk, APPROX_BETWEENNESS_SAMPLES, normalized=True, parallel=True
+        )
+    else:
+        algo = nk.centrality.Betweenness(G_nk, normalized=True)
+    algo.run()
+    return {node: algo.score(i) for node, i in index.items()}
+
+
+def _edge_betweenness(G, weight='weight'):
+    """
+    Normalized edge betweenness centrality, computed by NetworKit when
+    available and networkx otherwise
+    """
+    n = G.number_of_nodes()
+    if nk is None or n <= 2:
+        return nx.edge_betweenness_centrality(G, weight=weight)
+    
+    G_nk, index = _to_networkit(G, weight)
+    G_nk.indexEdges()
+    algo = nk.centrality.Betweenness(G_nk, computeEdgeCentrality=True)
+    algo.run()
+    scores = algo.edgeScores()
+    # NetworKit counts ordered pairs; networkx normalizes by n(n-1)
+    scale = 1 / (n * (n - 1))
+    return {
+        (u, v): scores[G_nk.edgeId(index[u], index[v])] * scale
+        for u, v in G.edges()
+    }
+
 class AdvancedNetworkOptimization:
     def __init__(self, network_topology):
         """
@@ -11,7 +477,25 @@ class AdvancedNetworkOptimization:
         """
         self.topology = network_topology
         self.G = network_topology.G
+        self._csr = None
+        self._csr_nodes = None
+        self._csr_fingerprint = None
+    
+    def _adjacency(self):
+        """
+        CSR adjacency matrix of the graph and the node order of its rows,
+        rebuilt only when the topology has changed
+        """
+        fingerprint = _graph_fingerprint(self.topology)
+        if fingerprint != self._csr_fingerprint:
+            self._csr_nodes = list(self.G.nodes())
+            self._csr = nx.to_scipy_sparse_array(
+                self.G, nodelist=self._csr_nodes, weight='weight', format='csr'
+            )
+            self._csr_fingerprint = fingerprint
+        return self._csr_nodes, self._csr
     
+    @_cached_report
     def analyze_network_resilience(self):
         """
         Analyze network resilience by calculating:
@@ -19,15 +503,18 @@ class AdvancedNetworkOptimization:
         2. Node criticality
         3. Network diameter
         """
+        # Connectedness, diameter and betweenness from one traversal per source
+        path_stats = _path_statistics(self.G, weight='weight')
+        
         resilience_report = {
-            'is_connected': nx.is_connected(self.G),
+            'is_connected': path_stats['is_connected'],
             'connectivity': nx.node_connectivity(self.G),
-            'network_diameter': nx.diameter(self.G),
+            'network_diameter': path_stats['diameter'],
             'critical_nodes': []
         }
         
         # Identify critical nodes using betweenness centrality
-        betweenness_centrality = nx.betweenness_centrality(self.G, weight='weight')
+        betweenness_centrality = path_stats['betweenness']
         critical_threshold = sorted(betweenness_centrality.values(), reverse=True)[
             max(1, len(betweenness_centrality) // 4)
         ]
@@ -43,6 +530,7 @@ class AdvancedNetworkOptimization:
         
         return resilience_report
     
+    @_cached_report
     def optimize_routing_paths(self):
         """
         Optimize routing paths by:
@@ -50,8 +538,7 @@ class AdvancedNetworkOptimization:
         2. Calculating path redundancy
         3. Identifying potential bottlenecks
         """
-        # Get all possible node pairs
-        node_pairs = list(nx.non_edges(self.G))
+        nodes = list(self.G.nodes())
         
         optimization_report = {
             'alternative_paths': [],
@@ -60,10 +547,13 @@ class AdvancedNetworkOptimization:
         }
         
         # Find alternative paths and potential bottlenecks
-        for start, end in [(n1, n2) for n1 in self.G.nodes() for n2 in self.G.nodes() if n1 != n2]:
+        for start, end in combinations(nodes, 2):
             try:
-                # Find all simple paths
-                paths = list(nx.all_simple_paths(self.G, start, end, cutoff=5))
+                # Find the k shortest simple paths (Yen's algorithm)
+                paths = list(islice(
+                    nx.shortest_simple_paths(self.G, start, end, weight='weight'),
+                    MAX_ALTERNATIVE_PATHS
+                ))
                 
                 if paths:
                     # Analyze paths
@@ -71,26 +561,19 @@ class AdvancedNetworkOptimization:
                         'start': start,
                         'end': end,
                         'total_paths': len(paths),
-                        'paths': [],
-                        'path_weights': []
+                        'paths': paths,
+                        'path_weights': [
+                            nx.path_weight(self.G, path, weight='weight')
+                            for path in paths
+                        ]
                     }
                     
-                    for path in paths:
-                        # Calculate path weight
-                        path_weight = sum(
-                            self.G[path[i]][path[i+1]].get('weight', 1) 
-                            for i in range(len(path)-1)
-                        )
-                        
-                        path_analysis['paths'].append(path)
-                        path_analysis['path_weights'].append(path_weight)
-                    
                     optimization_report['alternative_paths'].append(path_analysis)
             except nx.NetworkXNoPath:
                 continue
         
         # Identify bottlenecks using edge betweenness centrality
-        edge_betweenness = nx.edge_betweenness_centrality(self.G, weight='weight')
+        edge_betweenness = _edge_betweenness(self.G, weight='weight')
         bottleneck_threshold = sorted(edge_betweenness.values(), reverse=True)[
             max(1, len(edge_betweenness) // 4)
         ]
@@ -106,39 +589,60 @@ class AdvancedNetworkOptimization:
         
         return optimization_report
     
+    @_cached_report
+    def _most_central_nodes(self):
+        """
+        The top fifth of nodes by (unweighted) betweenness centrality
+        """
+        betweenness = _node_betweenness(self.G, weight=None)
+        critical_nodes = sorted(
+            betweenness.items(), 
+            key=lambda x: x[1], 
+            reverse=True
+        )[:max(1, self.G.number_of_nodes() // 5)]
+        
+        return [node for node, _ in critical_nodes]
+    
     def simulate_network_failure(self, failure_scenario='random'):
         """
         Simulate network failure scenarios
         """
-        # Create a copy of the graph to simulate failures
-        G_simulate = self.G.copy()
+        nodes, A = self._adjacency()
+        n = len(nodes)
+        removed_nodes = []
         
         if failure_scenario == 'random':
             # Randomly remove nodes or edges
-            nodes_to_remove = random.sample(
-                list(G_simulate.nodes()), 
-                k=max(1, len(G_simulate.nodes()) // 4)
-            )
-            G_simulate.remove_nodes_from(nodes_to_remove)
+            removed_nodes = random.sample(nodes, k=max(1, n // 4))
         
         elif failure_scenario == 'targeted':
             # Remove most critical nodes
-            betweenness = nx.betweenness_centrality(G_simulate)
-            critical_nodes = sorted(
-                betweenness.items(), 
-                key=lambda x: x[1], 
-                reverse=True
-            )[:max(1, len(G_simulate.nodes()) // 5)]
-            
-            G_simulate.remove_nodes_from([node for node, _ in critical_nodes])
+            removed_nodes = list(self._most_central_nodes())
+        
+        # Analyze network after failure. One components pass over the CSR
+        # adjacency of the surviving nodes answers connectedness, and the
+        # max-flow node connectivity is only needed when the remaining
+        # graph is still connected (otherwise it is 0)
+        removed = set(removed_nodes)
+        kept = np.array([i for i, node in enumerate(nodes) if node not in removed], dtype=np.intp)
+        n_components, labels = connected_components(A[kept][:, kept], directed=False)
+        components = [[] for _ in range(n_components)]
+        for i, label in zip(kept, labels):
+            components[label].append(nodes[i])
+        is_connected = n_components == 1
+        
+        remaining_connectivity = 0
+        if is_connected:
+            # Read-only view of the surviving nodes instead of a graph copy
+            G_simulate = nx.subgraph_view(self.G, filter_node=lambda node: node not in removed)
+            remaining_connectivity = nx.node_connectivity(G_simulate)
         
-        # Analyze network after failure
         failure_report = {
             'scenario': failure_scenario,
-            'removed_nodes': list(set(self.G.nodes()) - set(G_simulate.nodes())),
-            'is_connected': nx.is_connected(G_simulate),
-            'connected_components': list(nx.connected_components(G_simulate)),
-            'remaining_connectivity': nx.node_connectivity(G_simulate)
+            'removed_nodes': removed_nodes,
+            'is_connected': is_connected,
+            'connected_components': components,
+            'remaining_connectivity': remaining_connectivity
         }
         
         return failure_report
@@ -1,13 +1,23 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
 from flask_socketio import SocketIO, emit
 import sqlite3
 import json
+import math
 import datetime
 import os
 import sys
+import time
+import queue
+import atexit
+import threading
+import uuid
 import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from shapely.ops import unary_union
 from network_topology import NetworkTopology
+from advanced_optimization import AdvancedNetworkOptimization
+from json_response import json_bytes, fast_json
 
 
 # Create database if it doesn't exist
@@ -47,6 +57,190 @@ else:
         pass
     conn.close()
 
+# Single long-lived connection shared by all routes. WAL lets readers run
+# alongside the writer and synchronous=NORMAL avoids an fsync per commit.
+_db = sqlite3.connect('network_data.db', check_same_thread=False, isolation_level=None)
+_db.row_factory = sqlite3.Row
+_db.execute('PRAGMA journal_mode=WAL')
+_db.execute('PRAGMA synchronous=NORMAL')
+_db.execute('PRAGMA temp_store=MEMORY')
+_db_lock = threading.Lock()
+
+INSERT_METRICS_SQL = '''
+    INSERT INTO network_metrics 
+    (node_id, protocol, rssi, channel, packets_total, packets_lost, latency, throughput, avg_latency, avg_throughput)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Per-minute rollup of network_metrics by node and protocol, kept current by
+# the background writer so the stats endpoints read pre-aggregated buckets
+STATS_TABLE_SQL = '''
+    CREATE TABLE stats_1min (
+        bucket TEXT,
+        node_id TEXT,
+        protocol TEXT,
+        count INTEGER,
+        sum_latency REAL,
+        sum_throughput REAL,
+        sum_packet_loss REAL,
+        sum_rssi REAL,
+        count_latency INTEGER,
+        count_throughput INTEGER,
+        count_packet_loss INTEGER,
+        count_rssi INTEGER,
+        min_latency REAL,
+        max_latency REAL,
+        first_seen DATETIME,
+        last_seen DATETIME,
+        PRIMARY KEY (bucket, node_id, protocol)
+    )
+'''
+
+# Fold every network_metrics row with id > ? into its stats_1min bucket.
+# SQLite treats NULLs in the primary key as distinct, so a missing node_id is
+# stored as '' (read back as NULL) and rows without a protocol, which the
+# stats endpoints never report, are skipped. Like AVG, the averages skip NULL
+# metrics: each metric keeps its own non-NULL count, and sums use TOTAL so a
+# NULL never turns a bucket's sum into NULL.
+ROLLUP_STATS_SQL = '''
+    INSERT INTO stats_1min
+    SELECT
+        strftime('%Y-%m-%d %H:%M', timestamp) as bucket,
+        COALESCE(node_id, '') as node_id,
+        protocol,
+        COUNT(*),
+        TOTAL(latency),
+        TOTAL(throughput),
+        TOTAL(CASE WHEN packets_total > 0 THEN (packets_lost * 100.0 / packets_total) ELSE 0 END),
+        TOTAL(rssi),
+        COUNT(latency),
+        COUNT(throughput),
+        COUNT(CASE WHEN packets_total > 0 THEN (packets_lost * 100.0 / packets_total) ELSE 0 END),
+        COUNT(rssi),
+        MIN(latency),
+        MAX(latency),
+        MIN(timestamp),
+        MAX(timestamp)
+    FROM network_metrics
+    WHERE id > ? AND protocol IS NOT NULL
+    GROUP BY bucket, COALESCE(node_id, ''), protocol
+    ON CONFLICT (bucket, node_id, protocol) DO UPDATE SET
+        count = count + excluded.count,
+        sum_latency = sum_latency + excluded.sum_latency,
+        sum_throughput = sum_throughput + excluded.sum_throughput,
+        sum_packet_loss = sum_packet_loss + excluded.sum_packet_loss,
+        sum_rssi = sum_rssi + excluded.sum_rssi,
+        count_latency = count_latency + excluded.count_latency,
+        count_throughput = count_throughput + excluded.count_throughput,
+        count_packet_loss = count_packet_loss + excluded.count_packet_loss,
+        count_rssi = count_rssi + excluded.count_rssi,
+        min_latency = MIN(COALESCE(min_latency, excluded.min_latency), COALESCE(excluded.min_latency, min_latency)),
+        max_latency = MAX(COALESCE(max_latency, excluded.max_latency), COALESCE(excluded.max_latency, max_latency)),
+        first_seen = MIN(first_seen, excluded.first_seen),
+        last_seen = MAX(last_seen, excluded.last_seen)
+'''
+
+if 'count_latency' not in {row['name'] for row in _db.execute('PRAGMA table_info(stats_1min)')}:
+    # First run with the rollup, or with an older layout of it: build it
+    # from the existing history
+    _db.execute('BEGIN')
+    _db.execute('DROP TABLE IF EXISTS stats_1min')
+    _db.execute(STATS_TABLE_SQL)
+    _db.execute(ROLLUP_STATS_SQL, (0,))
+    _db.execute('COMMIT')
+
+# Indices matching the time-window filters of the history queries
+_db.execute('CREATE INDEX IF NOT EXISTS idx_ts ON network_metrics(timestamp)')
+_db.execute('CREATE INDEX IF NOT EXISTS idx_node_ts ON network_metrics(node_id, timestamp)')
+_db.execute('CREATE INDEX IF NOT EXISTS idx_proto_ts ON network_metrics(protocol, timestamp)')
+_db.execute('CREATE INDEX IF NOT EXISTS idx_node_proto_ts ON network_metrics(node_id, protocol, timestamp)')
+# Refresh planner statistics (runs ANALYZE only where it is out of date)
+_db.execute('PRAGMA optimize')
+
+@contextmanager
+def get_db():
+    """Serialize access to the shared database connection"""
+    with _db_lock:
+        yield _db
+
+# Incoming metrics are queued by /api/data and written in batches by a
+# background thread, so a request never waits on a commit.
+WRITE_BATCH_SIZE = 500
+WRITE_FLUSH_INTERVAL = 0.1  # seconds
+OPTIMIZE_INTERVAL = 3600  # seconds between planner statistics refreshes
+_write_queue = queue.Queue()
+
+def _drain_write_queue():
+    """Block for the next row, then collect more until the batch is full or the flush interval expires"""
+    batch = [_write_queue.get()]
+    deadline = time.monotonic() + WRITE_FLUSH_INTERVAL
+    while len(batch) < WRITE_BATCH_SIZE:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_write_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+def _write_rows(conn, rows):
+    """Insert rows and fold them into stats_1min in one transaction"""
+    conn.execute('BEGIN')
+    try:
+        last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM network_metrics').fetchone()[0]
+        conn.executemany(INSERT_METRICS_SQL, rows)
+        conn.execute(ROLLUP_STATS_SQL, (last_id,))
+        conn.execute('COMMIT')
+    except Exception:
+        if conn.in_transaction:
+            conn.execute('ROLLBACK')
+        raise
+
+def _metrics_writer():
+    """Background writer: insert queued rows and roll them up, one transaction per batch"""
+    next_optimize = time.monotonic() + OPTIMIZE_INTERVAL
+    while True:
+        batch = _drain_write_queue()
+        try:
+            with get_db() as conn:
+                try:
+                    _write_rows(conn, batch)
+                except Exception as e:
+                    # Retry row by row so one bad row cannot drop the rest of the batch
+                    print(f"Failed to write {len(batch)} metrics rows, retrying one at a time: {e}")
+                    for row in batch:
+                        try:
+                            _write_rows(conn, [row])
+                        except Exception as e:
+                            print(f"Dropped metrics row {row}: {e}")
+                if time.monotonic() >= next_optimize:
+                    conn.execute('PRAGMA optimize')
+                    next_optimize = time.monotonic() + OPTIMIZE_INTERVAL
+        except Exception as e:
+            # Keep the writer alive whatever happens to one batch
+            print(f"Metrics writer error: {e}")
+        finally:
+            for _ in batch:
+                _write_queue.task_done()
+
+EXIT_FLUSH_TIMEOUT = 5  # seconds
+
+def _flush_write_queue():
+    """Wait up to EXIT_FLUSH_TIMEOUT seconds for the writer to drain the queue"""
+    deadline = time.monotonic() + EXIT_FLUSH_TIMEOUT
+    with _write_queue.all_tasks_done:
+        while _write_queue.unfinished_tasks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                print(f"Exiting with {_write_queue.unfinished_tasks} metrics rows unwritten")
+                return
+            _write_queue.all_tasks_done.wait(remaining)
+
+threading.Thread(target=_metrics_writer, name='metrics-writer', daemon=True).start()
+# Flush rows still waiting in the queue before the interpreter exits
+atexit.register(_flush_write_queue)
+
 
 
 import pandas as pd
@@ -66,6 +260,39 @@ historical_df = historical_df.rename(columns={
 })
 historical_df = historical_df.set_index('Timestamp').sort_index()
 historical_df = historical_df[metrics].resample('1min').mean().interpolate()
+
+# QoS forecast model for /api/data: 'ewma' keeps an O(1) exponentially
+# weighted moving average per metric; 'arima' extends SVD-denoised ARIMA
+# models fitted at startup (much slower, meant for offline bulk scoring)
+QOS_FORECAST_MODEL = 'ewma'
+EWMA_ALPHA = 0.2
+_forecast_lock = threading.Lock()
+
+if QOS_FORECAST_MODEL == 'arima':
+    # Fit the SVD denoiser and the per-metric ARIMA models once at startup.
+    # Each new observation is projected onto the fitted components and the
+    # ARIMA results are extended in place, so no request refits on full history.
+    svd = TruncatedSVD(n_components=2)
+    historical_reconstructed = svd.inverse_transform(svd.fit_transform(historical_df.to_numpy()))
+    _arima_fits = {
+        metric: ARIMA(historical_reconstructed[:, i], order=(2, 1, 2)).fit()
+        for i, metric in enumerate(metrics)
+    }
+
+    # Fixed-size ring buffer of the most recent observations; the SVD is
+    # refitted on it periodically so the denoiser follows recent traffic
+    # without keeping or copying the growing history
+    QOS_WINDOW = 1440  # one day of 1-minute samples
+    SVD_REFIT_INTERVAL = 60  # observations between SVD refits
+    _window = np.empty((QOS_WINDOW, len(metrics)), dtype=np.float64)
+    _seed = historical_df.to_numpy()[-QOS_WINDOW:]
+    _window[:len(_seed)] = _seed
+    _window_size = len(_seed)
+    _window_head = _window_size % QOS_WINDOW
+    _since_refit = 0
+else:
+    # Seed each moving average from the historical series
+    _ewma = historical_df.ewm(alpha=EWMA_ALPHA).mean().iloc[-1].to_dict()
 # Check if optimization module exists
 optimization_spec = importlib.util.find_spec('optimization')
 if optimization_spec is None:
@@ -82,33 +309,83 @@ else:
 
 # Create a global instance of NetworkTopology
 network_topology = NetworkTopology()
+# Shared optimizer, so its cached CSR adjacency survives between requests
+network_optimizer = AdvancedNetworkOptimization(network_topology)
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'network-monitoring-secret!'
 socketio = SocketIO(app, cors_allowed_origins="*")
 
+STREAM_CHUNK_ROWS = 200
+
+def stream_json_rows(rows):
+    """Stream database rows as a JSON array, serializing STREAM_CHUNK_ROWS rows at a time"""
+    def generate():
+        yield b'['
+        for start in range(0, len(rows), STREAM_CHUNK_ROWS):
+            if start:
+                yield b','
+            yield b','.join(json_bytes(dict(row)) for row in rows[start:start + STREAM_CHUNK_ROWS])
+        yield b']'
+    return Response(generate(), mimetype='application/json')
+
 @app.route('/')
 def index():
     return render_template('index.html')
+METRIC_FIELDS = (
+    'rssi', 'channel', 'packets_total', 'packets_lost',
+    'latency', 'throughput', 'avg_latency', 'avg_throughput'
+)
+
+def _coerce_metric(value):
+    """Return value as a finite int or float that sqlite can store, or raise ValueError"""
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"Invalid metric value: {value!r}")
+    if isinstance(value, int) and -2**63 <= value < 2**63:
+        return value
+    try:
+        value = float(value)
+    except (ValueError, OverflowError):
+        raise ValueError(f"Invalid metric value: {value!r}")
+    if not math.isfinite(value):
+        raise ValueError(f"Metric value must be finite: {value!r}")
+    return value
+
+def _coerce_label(value):
+    """Return a node id or protocol as a string, or raise ValueError"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise ValueError(f"Invalid label: {value!r}")
+
 @app.route('/api/data', methods=['POST'])
 def receive_data():
     if not request.json:
         return jsonify({'status': 'error', 'message': 'No data provided'}), 400
 
     data = request.json
+    if not isinstance(data, dict):
+        return jsonify({'status': 'error', 'message': 'Expected a JSON object'}), 400
+
+    # Coerce fields here so a value sqlite cannot store never reaches the writer
+    try:
+        for field in METRIC_FIELDS:
+            if data.get(field) is not None:
+                data[field] = _coerce_metric(data[field])
+        for field in ('protocol', 'node_id'):
+            if data.get(field) is not None:
+                data[field] = _coerce_label(data[field])
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
     protocol = data.get('protocol', 'TCP')
     node_id = data.get('node_id', 'unknown')
 
     print(f"Received {protocol} data from node: {node_id}")
 
-    # Store in database
-    conn = sqlite3.connect('network_data.db')
-    c = conn.cursor()
-    c.execute('''
-        INSERT INTO network_metrics 
-        (node_id, protocol, rssi, channel, packets_total, packets_lost, latency, throughput, avg_latency, avg_throughput)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
+    # Queue for the background writer
+    _write_queue.put((
         node_id,
         protocol,
         data.get('rssi', 0),
@@ -120,8 +397,6 @@ def receive_data():
         data.get('avg_latency', 0),
         data.get('avg_throughput', 0)
     ))
-    conn.commit()
-    conn.close()
 
     # Add timestamp for real-time data
     data['timestamp'] = datetime.datetime.now().isoformat()
@@ -159,10 +434,6 @@ def get_history():
     node_id = request.args.get('node_id', None)
     protocol = request.args.get('protocol', None)
     
-    conn = sqlite3.connect('network_data.db')
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    
     query = '''
         SELECT * FROM network_metrics 
         WHERE timestamp >= datetime('now', '-' || ? || ' hours')
@@ -179,107 +450,92 @@ def get_history():
         
     query += ' ORDER BY timestamp DESC LIMIT 1000'
     
-    c.execute(query, params)
-    rows = c.fetchall()
-    conn.close()
+    # Rows are fetched under the database lock, but serialized while the
+    # response streams so no list of dicts or full JSON body is built
+    with get_db() as conn:
+        rows = conn.execute(query, params).fetchall()
     
-    # Convert to list of dicts
-    result = [dict(row) for row in rows]
-    return jsonify(result)
+    return stream_json_rows(rows)
 
 @app.route('/api/protocols', methods=['GET'])
 def get_protocols():
     """Get list of available protocols"""
-    conn = sqlite3.connect('network_data.db')
-    c = conn.cursor()
-    c.execute('SELECT DISTINCT protocol FROM network_metrics WHERE protocol IS NOT NULL')
-    protocols = [row[0] for row in c.fetchall()]
-    conn.close()
+    with get_db() as conn:
+        rows = conn.execute('SELECT DISTINCT protocol FROM network_metrics WHERE protocol IS NOT NULL').fetchall()
+    protocols = [row[0] for row in rows]
     
     # Add default protocols if none exist
     if not protocols:
         protocols = ['HTTP', 'MQTT', 'UDP', 'TCP', 'ICMP', 'SMTP']
     
-    return jsonify(protocols)
+    return fast_json(protocols)
 
 @app.route('/api/nodes', methods=['GET'])
 def get_nodes():
     """Get list of available nodes"""
-    conn = sqlite3.connect('network_data.db')
-    c = conn.cursor()
-    c.execute('SELECT DISTINCT node_id FROM network_metrics WHERE node_id IS NOT NULL')
-    nodes = [row[0] for row in c.fetchall()]
-    conn.close()
+    with get_db() as conn:
+        rows = conn.execute('SELECT DISTINCT node_id FROM network_metrics WHERE node_id IS NOT NULL').fetchall()
+    nodes = [row[0] for row in rows]
     
-    return jsonify(nodes)
+    return fast_json(nodes)
 
 @app.route('/api/protocol-stats', methods=['GET'])
 def get_protocol_stats():
     """Get aggregated statistics by protocol"""
     hours = request.args.get('hours', 24, type=int)
     
-    conn = sqlite3.connect('network_data.db')
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    
     query = '''
         SELECT 
             protocol,
-            COUNT(*) as count,
-            AVG(latency) as avg_latency,
-            AVG(throughput) as avg_throughput,
-            AVG(CASE WHEN packets_total > 0 THEN (packets_lost * 100.0 / packets_total) ELSE 0 END) as avg_packet_loss,
-            AVG(rssi) as avg_rssi,
-            MIN(latency) as min_latency,
-            MAX(latency) as max_latency,
-            MIN(timestamp) as first_seen,
-            MAX(timestamp) as last_seen
-        FROM network_metrics 
-        WHERE timestamp >= datetime('now', '-' || ? || ' hours')
+            SUM(count) as count,
+            SUM(sum_latency) / SUM(count_latency) as avg_latency,
+            SUM(sum_throughput) / SUM(count_throughput) as avg_throughput,
+            SUM(sum_packet_loss) / SUM(count_packet_loss) as avg_packet_loss,
+            SUM(sum_rssi) / SUM(count_rssi) as avg_rssi,
+            MIN(min_latency) as min_latency,
+            MAX(max_latency) as max_latency,
+            MIN(first_seen) as first_seen,
+            MAX(last_seen) as last_seen
+        FROM stats_1min 
+        WHERE bucket >= strftime('%Y-%m-%d %H:%M', 'now', '-' || ? || ' hours')
         AND protocol IS NOT NULL
         GROUP BY protocol
         ORDER BY count DESC
     '''
     
-    c.execute(query, [hours])
-    rows = c.fetchall()
-    conn.close()
+    with get_db() as conn:
+        rows = conn.execute(query, [hours]).fetchall()
     
     result = [dict(row) for row in rows]
-    return jsonify(result)
+    return fast_json(result)
 
 @app.route('/api/node-protocol-stats', methods=['GET'])
 def get_node_protocol_stats():
     """Get statistics by node and protocol combination"""
     hours = request.args.get('hours', 24, type=int)
     
-    conn = sqlite3.connect('network_data.db')
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    
     query = '''
         SELECT 
-            node_id,
+            NULLIF(node_id, '') as node_id,
             protocol,
-            COUNT(*) as count,
-            AVG(latency) as avg_latency,
-            AVG(throughput) as avg_throughput,
-            AVG(CASE WHEN packets_total > 0 THEN (packets_lost * 100.0 / packets_total) ELSE 0 END) as avg_packet_loss,
-            AVG(rssi) as avg_rssi,
-            MAX(timestamp) as last_seen
-        FROM network_metrics 
-        WHERE timestamp >= datetime('now', '-' || ? || ' hours')
+            SUM(count) as count,
+            SUM(sum_latency) / SUM(count_latency) as avg_latency,
+            SUM(sum_throughput) / SUM(count_throughput) as avg_throughput,
+            SUM(sum_packet_loss) / SUM(count_packet_loss) as avg_packet_loss,
+            SUM(sum_rssi) / SUM(count_rssi) as avg_rssi,
+            MAX(last_seen) as last_seen
+        FROM stats_1min 
+        WHERE bucket >= strftime('%Y-%m-%d %H:%M', 'now', '-' || ? || ' hours')
         AND protocol IS NOT NULL
-        GROUP BY node_id, protocol
+        GROUP BY NULLIF(node_id, ''), protocol
         ORDER BY node_id, protocol
     '''
     
-    c.execute(query, [hours])
-    rows = c.fetchall()
-    conn.close()
+    with get_db() as conn:
+        rows = conn.execute(query, [hours]).fetchall()
     
     result = [dict(row) for row in rows]
-    return jsonify(result)
+    return fast_json(result)
 
 @app.route('/dashboard')
 def dashboard():
@@ -312,7 +568,7 @@ def optimization_dashboard():
 def get_network_topology():
     """Return the current network topology"""
     topology = network_topology.get_topology()
-    return jsonify(topology)
+    return fast_json(topology)
 
 @app.route('/api/network/routing', methods=['POST'])
 def calculate_routing():
@@ -333,55 +589,74 @@ def calculate_routing():
         start_node, end_node, routing_algorithm
     )
     
-    return jsonify(result)
+    return fast_json(result)
 
 @app.route('/api/network/resilience', methods=['GET'])
 def analyze_resilience():
     """Analyze network resilience"""
-    # Import here to avoid circular imports
-    from advanced_optimization import AdvancedNetworkOptimization
-    
-    # Create optimizer using network topology
-    optimizer = AdvancedNetworkOptimization(network_topology)
-    
     # Get resilience report
-    resilience_report = optimizer.analyze_network_resilience()
-    
-    return jsonify(resilience_report)
+    resilience_report = network_optimizer.analyze_network_resilience()
+    
+    return fast_json(resilience_report)
+
+# Failure simulations run on a worker pool instead of the request thread.
+# Results are pushed over socket.io as 'failure_result' and can be polled
+# by job id; only the most recent MAX_SIMULATION_JOBS jobs are kept.
+MAX_SIMULATION_JOBS = 100
+_simulation_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='failure-sim')
+_simulation_jobs = {}
+_simulation_jobs_lock = threading.Lock()
+
+def _emit_failure_result(job_id, future):
+    """Broadcast a finished failure simulation to the frontend"""
+    error = future.exception()
+    if error is not None:
+        socketio.emit('failure_result', {'job_id': job_id, 'status': 'error', 'message': str(error)})
+    else:
+        socketio.emit('failure_result', {'job_id': job_id, 'status': 'ok', 'report': future.result()})
 
 @app.route('/api/network/failure-simulation', methods=['POST'])
 def simulate_failure():
-    """Simulate network failure scenarios"""
+    """Start a network failure simulation and return its job id"""
     data = request.json
     if not data:
         return jsonify({'error': 'No data provided'}), 400
     
     scenario = data.get('scenario', 'random')
     
-    # Import here to avoid circular imports  
-    from advanced_optimization import AdvancedNetworkOptimization
+    job_id = uuid.uuid4().hex
+    future = _simulation_executor.submit(network_optimizer.simulate_network_failure, scenario)
+    with _simulation_jobs_lock:
+        _simulation_jobs[job_id] = future
+        while len(_simulation_jobs) > MAX_SIMULATION_JOBS:
+            del _simulation_jobs[next(iter(_simulation_jobs))]
+    future.add_done_callback(lambda f: _emit_failure_result(job_id, f))
     
-    # Create optimizer using network topology
-    optimizer = AdvancedNetworkOptimization(network_topology)
+    return jsonify({'status': 'accepted', 'job_id': job_id}), 202
+
+@app.route('/api/network/failure-simulation/<job_id>', methods=['GET'])
+def get_failure_simulation(job_id):
+    """Get the report of a failure simulation job"""
+    with _simulation_jobs_lock:
+        future = _simulation_jobs.get(job_id)
+    if future is None:
+        return jsonify({'error': 'Unknown job id'}), 404
+    if not future.done():
+        return jsonify({'status': 'running', 'job_id': job_id}), 202
     
-    # Get failure report
-    failure_report = optimizer.simulate_network_failure(scenario)
+    error = future.exception()
+    if error is not None:
+        return jsonify({'status': 'error', 'message': str(error)}), 500
     
-    return jsonify(failure_report)
+    return fast_json(future.result())
 
 @app.route('/api/network/routing-optimization', methods=['GET'])
 def optimize_routing():
     """Optimize routing paths"""
-    # Import here to avoid circular imports
-    from advanced_optimization import AdvancedNetworkOptimization
-    
-    # Create optimizer using network topology
-    optimizer = AdvancedNetworkOptimization(network_topology)
-    
     # Get optimization report
-    optimization_report = optimizer.optimize_routing_paths()
+    optimization_report = network_optimizer.optimize_routing_paths()
     
-    return jsonify(optimization_report)
+    return fast_json(optimization_report)
 
 # Add a route for the network simulator UI
 @app.route('/network-simulator')
@@ -418,10 +693,6 @@ def handle_protocol_data_request(data):
     node_id = data.get('node_id')
     hours = data.get('hours', 1)
     
-    conn = sqlite3.connect('network_data.db')
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    
     query = '''
         SELECT * FROM network_metrics 
         WHERE timestamp >= datetime('now', '-' || ? || ' hours')
@@ -438,9 +709,8 @@ def handle_protocol_data_request(data):
     
     query += ' ORDER BY timestamp DESC LIMIT 100'
     
-    c.execute(query, params)
-    rows = c.fetchall()
-    conn.close()
+    with get_db() as conn:
+        rows = conn.execute(query, params).fetchall()
     
     result = [dict(row) for row in rows]
     emit('protocol_data_response', result)
@@ -459,31 +729,56 @@ def classify_qos(row):
     else:
         return "Medium"
 
+# Vectorized QoS classification for a DataFrame of metrics (bulk scoring)
+def classify_qos_vec(df):
+    high = (df['latency'] < 50) & (df['rssi'] > -60) & (df['packet_loss'] < 1) & (df['throughput'] > 100)
+    low = (df['latency'] > 150) | (df['packet_loss'] > 5) | (df['throughput'] < 30)
+    return pd.Series(np.select([high, low], ["High", "Low"], default="Medium"), index=df.index)
+
+def _record_observation(values):
+    """Write values into the ring buffer, refitting the SVD every SVD_REFIT_INTERVAL calls (caller holds _forecast_lock)"""
+    global _window_head, _window_size, _since_refit
+    _window[_window_head] = values
+    _window_head = (_window_head + 1) % QOS_WINDOW
+    _window_size = min(_window_size + 1, QOS_WINDOW)
+    _since_refit += 1
+    if _since_refit >= SVD_REFIT_INTERVAL:
+        svd.fit(_window[:_window_size])
+        _since_refit = 0
+
 # Main function: Takes new data point and returns predicted QoS
 def evaluate_qos(rssi: float, latency: float, packet_loss: float, throughput: float) -> str:
     try:
-        # Step 1: Append new data to historical
-        new_row = pd.DataFrame([[rssi, latency, packet_loss, throughput]], columns=metrics)
-        new_index = historical_df.index[-1] + pd.Timedelta(minutes=1)
-        data = pd.concat([historical_df, pd.DataFrame(new_row.values, index=[new_index], columns=metrics)])
-
-        # Step 2: SVD denoising
-        svd = TruncatedSVD(n_components=2)
-        reduced = svd.fit_transform(data)
-        reconstructed = svd.inverse_transform(reduced)
-        df_reconstructed = pd.DataFrame(reconstructed, columns=metrics, index=data.index)
-
-        # Step 3: Forecast 1 step ahead using ARIMA for each metric
+        values = (rssi, latency, packet_loss, throughput)
         forecast = {}
-        for metric in metrics:
-            series = df_reconstructed[metric]
-            model = ARIMA(series, order=(2, 1, 2))
-            model_fit = model.fit()
-            forecast[metric] = model_fit.forecast(steps=1)[0]
-
-        # Step 4: Classify QoS based on forecast
-        forecast_series = pd.Series(forecast)
-        qos_label = classify_qos(forecast_series)
+
+        if QOS_FORECAST_MODEL == 'arima':
+            with _forecast_lock:
+                # Missing (None) or non-finite readings are not recorded, so they
+                # cannot poison the window or the models for later requests
+                if all(value is not None and math.isfinite(value) for value in values):
+                    # Step 1: Record the observation and denoise it with the SVD components
+                    _record_observation(values)
+                    denoised = svd.inverse_transform(svd.transform(np.array([values], dtype=float)))[0]
+
+                    # Step 2: Extend each ARIMA model with the new value
+                    for metric, value in zip(metrics, denoised):
+                        _arima_fits[metric] = _arima_fits[metric].extend([value])
+
+                # Forecast each metric 1 step ahead
+                for metric in metrics:
+                    forecast[metric] = _arima_fits[metric].forecast(steps=1)[0]
+        else:
+            # Step 1-2: Update each metric's moving average, used as the 1-step
+            # forecast; missing or non-finite readings are skipped for the same reason
+            with _forecast_lock:
+                for metric, value in zip(metrics, values):
+                    if value is not None and math.isfinite(value):
+                        _ewma[metric] = EWMA_ALPHA * value + (1 - EWMA_ALPHA) * _ewma[metric]
+                    forecast[metric] = _ewma[metric]
+
+        # Step 3: Classify QoS based on forecast
+        qos_label = classify_qos(forecast)
 
         return qos_label
 
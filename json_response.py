@@ -0,0 +1,26 @@
+from flask import Response, jsonify
+import json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_bytes(obj):
+    """
+    Serialize obj to JSON bytes with orjson when installed, the json module otherwise
+    """
+    if orjson is None:
+        return json.dumps(obj).encode()
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS)
+
+
+def fast_json(obj, status=200):
+    """
+    JSON response serialized with orjson when installed, jsonify otherwise
+    """
+    if orjson is None:
+        response = jsonify(obj)
+        response.status_code = status
+        return response
+    return Response(json_bytes(obj), status=status, mimetype='application/json')
@@ -1,14 +1,250 @@
 import networkx as nx
 import numpy as np
-import random
+from random import random as _rnd
 import json
 import heapq
+from scipy.sparse.csgraph import dijkstra
+
+try:
+    import numba
+    from numba import njit, prange
+    # Parallel kernels here and in advanced_optimization run from request
+    # and background threads; TBB workers started outside the main thread
+    # keep the interpreter from exiting, so prefer OpenMP when available.
+    # This is the one place the process-wide setting is made.
+    numba.config.THREADING_LAYER_PRIORITY = ['omp', 'tbb', 'workqueue']
+except ImportError:
+    njit = None
+
+
+def _bellman_ford_dense(W, source):
+    """
+    Bellman-Ford over a dense weight matrix (inf where there is no link),
+    relaxing every link at once. Returns each node's distance from source
+    and its predecessor index (-1 if unreached)
+    """
+    n = W.shape[0]
+    columns = np.arange(n)
+    distance = np.full(n, np.inf)
+    distance[source] = 0
+    parent = np.full(n, -1, dtype=np.int64)
+    
+    for _ in range(n - 1):
+        candidates = distance[:, None] + W
+        best = np.argmin(candidates, axis=0)
+        best_distance = candidates[best, columns]
+        improved = best_distance < distance
+        if not improved.any():
+            break
+        distance[improved] = best_distance[improved]
+        parent[improved] = best[improved]
+    
+    return distance, parent
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _bellman_ford_csr(indptr, indices, weights, source):
+        """
+        Compiled Bellman-Ford over CSR arrays; same results as
+        _bellman_ford_dense
+        """
+        n = indptr.shape[0] - 1
+        distance = np.full(n, np.inf)
+        distance[source] = 0.0
+        parent = np.full(n, -1, dtype=np.int64)
+        
+        for _ in range(n - 1):
+            changed = False
+            for u in range(n):
+                du = distance[u]
+                if du == np.inf:
+                    continue
+                for k in range(indptr[u], indptr[u + 1]):
+                    v = indices[k]
+                    dv = du + weights[k]
+                    if dv < distance[v]:
+                        distance[v] = dv
+                        parent[v] = u
+                        changed = True
+            if not changed:
+                break
+        
+        return distance, parent
+    
+    @njit(parallel=True, cache=True)
+    def _apsp_csr(indptr, indices, weights):
+        """
+        All-pairs shortest paths over CSR arrays: an independent binary-heap
+        Dijkstra per source, run in parallel. Returns dist[n, n] and
+        pred[n, n] (-1 where there is no predecessor)
+        """
+        n = indptr.shape[0] - 1
+        m = indices.shape[0]
+        dist = np.full((n, n), np.inf)
+        pred = np.full((n, n), -1, dtype=np.int64)
+        
+        for s in prange(n):
+            distance = dist[s]
+            parent = pred[s]
+            settled = np.zeros(n, dtype=np.bool_)
+            # Heap entries are pushed once per improving relaxation, and
+            # each link is relaxed from a settled node only, so m + 1 fit
+            heap_cost = np.empty(m + 1)
+            heap_node = np.empty(m + 1, dtype=np.int64)
+            heap_cost[0] = 0.0
+            heap_node[0] = s
+            size = 1
+            distance[s] = 0.0
+            
+            while size > 0:
+                du = heap_cost[0]
+                u = heap_node[0]
+                size -= 1
+                if size > 0:
+                    # Sift the last entry down from the root
+                    last_cost = heap_cost[size]
+                    last_node = heap_node[size]
+                    i = 0
+                    while True:
+                        child = 2 * i + 1
+                        if child >= size:
+                            break
+                        if child + 1 < size and heap_cost[child + 1] < heap_cost[child]:
+                            child += 1
+                        if heap_cost[child] >= last_cost:
+                            break
+                        heap_cost[i] = heap_cost[child]
+                        heap_node[i] = heap_node[child]
+                        i = child
+                    heap_cost[i] = last_cost
+                    heap_node[i] = last_node
+                
+                if settled[u]:
+                    continue
+                settled[u] = True
+                
+                for k in range(indptr[u], indptr[u + 1]):
+                    v = indices[k]
+                    dv = du + weights[k]
+                    if dv < distance[v]:
+                        distance[v] = dv
+                        parent[v] = u
+                        # Sift the new entry up from the bottom
+                        i = size
+                        size += 1
+                        while i > 0:
+                            up = (i - 1) // 2
+                            if heap_cost[up] <= dv:
+                                break
+                            heap_cost[i] = heap_cost[up]
+                            heap_node[i] = heap_node[up]
+                            i = up
+                        heap_cost[i] = dv
+                        heap_node[i] = v
+        
+        return dist, pred
+
 
 class NetworkTopology:
     def __init__(self):
         # Create a graph representing the network topology
         self.G = nx.Graph()
+        # Bumped whenever the topology changes so cached analyses are recomputed
+        self.version = 0
         self.setup_network_topology()
+    
+    def mark_topology_changed(self):
+        """
+        Record a change to self.G; call after adding or removing nodes or links
+        """
+        self.version += 1
+        self._build_routing_caches()
+    
+    def _build_routing_caches(self):
+        """
+        Precompute the node index, weight matrix and adjacency used by routing
+        """
+        self._nodes = list(self.G.nodes())
+        self._idx = {node: i for i, node in enumerate(self._nodes)}
+        # W[u, v] is the link cost, inf where there is no link
+        self._W = nx.to_numpy_array(
+            self.G, nodelist=self._nodes, weight='weight', nonedge=np.inf
+        )
+        # Per-node (neighbor index, cost) pairs read from the raw adjacency
+        # dicts, for routing code that walks neighbors
+        self._adj_list = [
+            [(self._idx[v], attrs.get('weight', 1))
+             for v, attrs in self.G._adj[u].items()]
+            for u in self._nodes
+        ]
+        # Path costs are reported as ints when every link cost is one,
+        # like the sums networkx returns
+        self._integer_weights = all(
+            isinstance(w, (int, np.integer))
+            for _, _, w in self.G.edges(data='weight', default=1)
+        )
+        # The same links as a CSR matrix, and its arrays for the compiled
+        # Bellman-Ford kernel
+        self._csr = nx.to_scipy_sparse_array(
+            self.G, nodelist=self._nodes, weight='weight', format='csr'
+        )
+        self._indptr = self._csr.indptr.astype(np.int64)
+        self._indices = self._csr.indices.astype(np.int64)
+        self._weights = self._csr.data.astype(np.float64)
+        # All-pairs shortest path costs and predecessors, so Dijkstra
+        # queries are lookups: compiled and parallel over sources when numba
+        # is installed, otherwise one C-level csgraph Dijkstra call
+        if njit is not None:
+            self.compute_apsp_numba()
+        else:
+            self._apsp_costs, self._apsp_pred = dijkstra(
+                self._csr, directed=True, return_predecessors=True
+            )
+        # Link state database advertised by link_state_routing
+        # (a snapshot, so the payload never aliases the live edge attributes)
+        self._edges_snapshot = [(u, v, dict(d)) for u, v, d in self.G.edges(data=True)]
+    
+    def compute_apsp_numba(self):
+        """
+        Recompute the all-pairs shortest path tables with the parallel
+        numba kernel; returns the (dist, pred) matrices
+        """
+        if njit is None:
+            raise RuntimeError("compute_apsp_numba requires numba")
+        self._apsp_costs, self._apsp_pred = _apsp_csr(
+            self._indptr, self._indices, self._weights
+        )
+        return self._apsp_costs, self._apsp_pred
+    
+    def _path_cost(self, cost):
+        """
+        A finite path cost as the same type whichever algorithm computed it
+        """
+        return int(cost) if self._integer_weights else float(cost)
+    
+    def _shortest_path(self, start, end):
+        """
+        Look up the precomputed shortest path and its cost, or (None, inf)
+        """
+        if start not in self._idx:
+            raise nx.NodeNotFound(f"Source {start} is not in G")
+        if end not in self._idx:
+            return None, float('inf')
+        source = self._idx[start]
+        target = self._idx[end]
+        cost = self._apsp_costs[source, target]
+        if cost == np.inf:
+            return None, float('inf')
+        
+        predecessors = self._apsp_pred[source]
+        path = [end]
+        current = target
+        while current != source:
+            current = predecessors[current]
+            path.append(self._nodes[current])
+        path.reverse()
+        return path, self._path_cost(cost)
         
     def setup_network_topology(self):
         """
@@ -60,94 +296,99 @@ class NetworkTopology:
         # Add weighted edges
         for start, end, weight in links:
             self.G.add_edge(start, end, weight=weight)
+        
+        self.mark_topology_changed()
     
     def dijkstra_routing(self, start, end):
         """
         Implement Dijkstra's shortest path routing algorithm
         """
-        try:
-            path = nx.dijkstra_path(self.G, start, end, weight='weight')
-            path_length = nx.dijkstra_path_length(self.G, start, end, weight='weight')
-            return {
-                'path': path,
-                'total_cost': path_length
-            }
-        except nx.NetworkXNoPath:
-            return {
-                'path': None,
-                'total_cost': float('inf')
-            }
+        path, path_length = self._shortest_path(start, end)
+        return {
+            'path': path,
+            'total_cost': path_length
+        }
     
     def distance_vector_routing(self, start, end):
         """
         Simulate Distance Vector Routing Algorithm
         """
-        # Create routing table
-        routing_table = {}
-        nodes = list(self.G.nodes())
+        source = self._idx[start]
+        target = self._idx[end]
         
-        # Initialize routing table
-        for node in nodes:
-            routing_table[node] = {
-                'distance': float('inf'),
-                'next_hop': None
-            }
-        routing_table[start]['distance'] = 0
-        
-        # Bellman-Ford like iterations
-        for _ in range(len(nodes) - 1):
-            for node in nodes:
-                for neighbor in self.G.neighbors(node):
-                    edge_weight = self.G[node][neighbor].get('weight', 1)
-                    
-                    # Update distance if a shorter path is found
-                    if (routing_table[node]['distance'] + edge_weight < 
-                        routing_table[neighbor]['distance']):
-                        routing_table[neighbor]['distance'] = (
-                            routing_table[node]['distance'] + edge_weight
-                        )
-                        routing_table[neighbor]['next_hop'] = node
+        # Distance vector: each node's distance and next hop towards start
+        if njit is not None:
+            distance, next_hop = _bellman_ford_csr(
+                self._indptr, self._indices, self._weights, source
+            )
+        else:
+            distance, next_hop = _bellman_ford_dense(self._W, source)
         
         # Reconstruct path
         path = []
-        current = end
-        while current != start:
-            path.insert(0, current)
-            current = routing_table[current]['next_hop']
-            if current is None:
+        current = target
+        while current != source:
+            path.append(self._nodes[current])
+            current = next_hop[current]
+            if current < 0:
                 return {
                     'path': None,
                     'total_cost': float('inf')
                 }
-        path.insert(0, start)
+        path.append(start)
+        path.reverse()
         
         return {
             'path': path,
-            'total_cost': routing_table[end]['distance']
+            'total_cost': self._path_cost(distance[target])
         }
     
     def link_state_routing(self, start, end):
         """
         Simulate Link State Routing Algorithm (Dijkstra-based)
         """
-        # Create a link state database (graph representation)
-        link_state_db = nx.Graph(self.G)
+        if start not in self._idx:
+            raise nx.NodeNotFound(f"Source {start} is not in G")
+        source = self._idx[start]
+        target = self._idx.get(end)
         
-        # Use Dijkstra's algorithm from networkx
-        try:
-            path = nx.dijkstra_path(link_state_db, start, end, weight='weight')
-            path_length = nx.dijkstra_path_length(link_state_db, start, end, weight='weight')
-            return {
-                'path': path,
-                'total_cost': path_length,
-                'link_state_db': list(link_state_db.edges(data=True))
-            }
-        except nx.NetworkXNoPath:
+        # Shortest path first over the link state database, stopping once
+        # the destination is settled
+        distance = [float('inf')] * len(self._nodes)
+        previous = [-1] * len(self._nodes)
+        distance[source] = 0
+        queue = [(0, source)]
+        while queue:
+            d, u = heapq.heappop(queue)
+            if d > distance[u]:
+                continue
+            if u == target:
+                break
+            for v, w in self._adj_list[u]:
+                nd = d + w
+                if nd < distance[v]:
+                    distance[v] = nd
+                    previous[v] = u
+                    heapq.heappush(queue, (nd, v))
+        
+        if target is None or distance[target] == float('inf'):
             return {
                 'path': None,
                 'total_cost': float('inf'),
                 'link_state_db': []
             }
+        
+        path = []
+        current = target
+        while current != -1:
+            path.append(self._nodes[current])
+            current = previous[current]
+        path.reverse()
+        return {
+            'path': path,
+            'total_cost': self._path_cost(distance[target]),
+            'link_state_db': self._edges_snapshot
+        }
     
     def simulate_packet_transmission(self, start, end, routing_algorithm='dijkstra'):
         """
@@ -172,11 +413,9 @@ class NetworkTopology:
             }
         
         # Add some randomness to simulate real-world conditions
-        packet_loss_prob = random.uniform(0.01, 0.1)
-        transmission_delay = sum(
-            self.G[routing_result['path'][i]][routing_result['path'][i+1]].get('weight', 1) 
-            for i in range(len(routing_result['path'])-1)
-        )
+        packet_loss_prob = 0.01 + 0.09 * _rnd()
+        # Edge weights are the link delays, so the path cost is the delay
+        transmission_delay = routing_result['total_cost']
         
         return {
             'status': 'success',
@@ -1,96 +1,144 @@
-from flask import jsonify, request
+from flask import request
 from network_topology import NetworkTopology
 from advanced_optimization import AdvancedNetworkOptimization
+from json_response import fast_json
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # Initialize network topology and optimization
 network_topology = NetworkTopology()
 network_optimizer = AdvancedNetworkOptimization(network_topology)
 
+# Reports missing from the cache are computed on this pool, one run per
+# report at a time; while one runs, an expired report is served instead
+_analysis_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='analysis')
+_pending_reports = {}
+_pending_reports_lock = threading.Lock()
+
+def _report_done(name, future):
+    with _pending_reports_lock:
+        if _pending_reports.get(name) is future:
+            del _pending_reports[name]
+    error = future.exception()
+    if error is not None:
+        print(f"Computing {name} failed: {error}")
+
+def _submit_report(report):
+    """
+    Compute report on the analysis pool unless a run is already pending
+    """
+    name = report.__name__
+    with _pending_reports_lock:
+        future = _pending_reports.get(name)
+        submitted = future is None
+        if submitted:
+            future = _analysis_executor.submit(report, network_optimizer)
+            _pending_reports[name] = future
+    if submitted:
+        future.add_done_callback(lambda done: _report_done(name, done))
+    return future
+
+def get_report(report):
+    """
+    Return a cached AdvancedNetworkOptimization report. On a miss it is
+    computed on the analysis pool; if an expired report for the same
+    topology is still cached, that is returned without waiting
+    """
+    cached = report.peek(network_optimizer)
+    if cached is not None and cached[1]:
+        return cached[0]
+    future = _submit_report(report)
+    if cached is not None:
+        return cached[0]
+    return future.result()
+
 def register_optimization_routes(app):
     """
-    Register additional optimization-related routes
+    Register additional optimization-related routes; each also answers
+    with a trailing slash
     """
-    @app.route('/api/network/resilience', methods=['GET'])
+    @app.route('/api/network/resilience', methods=['GET'], strict_slashes=False)
     def get_network_resilience():
         """
         Endpoint to get network resilience analysis
         """
         try:
-            resilience_report = network_optimizer.analyze_network_resilience()
-            return jsonify(resilience_report)
+            resilience_report = get_report(AdvancedNetworkOptimization.analyze_network_resilience)
+            return fast_json(resilience_report)
         except Exception as e:
-            return jsonify({
+            return fast_json({
                 'status': 'error',
                 'message': str(e)
-            }), 500
+            }, 500)
     
-    @app.route('/api/network/routing-optimization', methods=['GET'])
+    @app.route('/api/network/routing-optimization', methods=['GET'], strict_slashes=False)
     def get_routing_optimization():
         """
         Endpoint to get routing path optimization details
         """
         try:
-            routing_optimization = network_optimizer.optimize_routing_paths()
-            return jsonify(routing_optimization)
+            routing_optimization = get_report(AdvancedNetworkOptimization.optimize_routing_paths)
+            return fast_json(routing_optimization)
         except Exception as e:
-            return jsonify({
+            return fast_json({
                 'status': 'error',
                 'message': str(e)
-            }), 500
+            }, 500)
     
-    @app.route('/api/network/failure-simulation', methods=['POST'])
+    @app.route('/api/network/failure-simulation', methods=['POST'], strict_slashes=False)
     def simulate_network_failure():
         """
         Endpoint to simulate network failure scenarios
         """
         try:
             # Get scenario from request, default to 'random'
-            scenario = request.json.get('scenario', 'random')
+            data = request.get_json(cache=True, silent=True) or {}
+            scenario = data.get('scenario', 'random')
             
             # Validate scenario
             allowed_scenarios = ['random', 'targeted']
             if scenario not in allowed_scenarios:
-                return jsonify({
+                return fast_json({
                     'status': 'error',
                     'message': f'Invalid scenario. Allowed scenarios: {allowed_scenarios}'
-                }), 400
+                }, 400)
             
             # Simulate network failure
             failure_report = network_optimizer.simulate_network_failure(scenario)
-            return jsonify(failure_report)
+            return fast_json(failure_report)
         except Exception as e:
-            return jsonify({
+            return fast_json({
                 'status': 'error',
                 'message': str(e)
-            }), 500
+            }, 500)
     
-    @app.route('/api/network/routing', methods=['POST'])
+    @app.route('/api/network/routing', methods=['POST'], strict_slashes=False)
     def simulate_packet_routing():
         """
         Endpoint to simulate packet routing between nodes
         """
         try:
             # Get routing parameters from request
-            data = request.json
+            data = request.get_json(cache=True, silent=True) or {}
             start_node = data.get('start_node')
             end_node = data.get('end_node')
             routing_algorithm = data.get('routing_algorithm', 'dijkstra')
             
             # Validate input
             if not start_node or not end_node:
-                return jsonify({
+                return fast_json({
                     'status': 'error',
                     'message': 'Start and end nodes are required'
-                }), 400
+                }, 400)
             
             # Allowed routing algorithms
             allowed_algorithms = ['dijkstra', 'distance_vector', 'link_state']
             if routing_algorithm not in allowed_algorithms:
-                return jsonify({
+                return fast_json({
                     'status': 'error',
                     'message': f'Invalid routing algorithm. Allowed: {allowed_algorithms}'
-                }), 400
+                }, 400)
             
             # Simulate packet transmission
             routing_result = network_topology.simulate_packet_transmission(
@@ -99,26 +147,26 @@ def register_optimization_routes(app):
                 routing_algorithm
             )
             
-            return jsonify(routing_result)
+            return fast_json(routing_result)
         except Exception as e:
-            return jsonify({
+            return fast_json({
                 'status': 'error',
                 'message': str(e)
-            }), 500
+            }, 500)
     
-    @app.route('/api/network/topology', methods=['GET'])
+    @app.route('/api/network/topology', methods=['GET'], strict_slashes=False)
     def get_network_topology():
         """
         Endpoint to get detailed network topology information
         """
         try:
             topology_details = network_topology.get_network_graph_details()
-            return jsonify(topology_details)
+            return fast_json(topology_details)
         except Exception as e:
-            return jsonify({
+            return fast_json({
                 'status': 'error',
                 'message': str(e)
-            }), 500
+            }, 500)
 
 # This function should be called in app.py after creating the Flask app
 # app = Flask(__name__)
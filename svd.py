@@ -1,7 +1,11 @@
+import os
+import pickle
+import hashlib
+import tempfile
 import pandas as pd
 import numpy as np
-from sklearn.decomposition import TruncatedSVD
 from statsmodels.tsa.arima.model import ARIMA
+from joblib import Parallel, delayed
 import matplotlib.pyplot as plt
 
 # Load and preprocess
@@ -21,46 +25,134 @@ df = df.sort_index()
 
 # Select only numeric QoS metric columns
 metrics = ['rssi', 'latency', 'packet_loss', 'throughput']
-data = df[metrics].copy()
+# float32 is ample for these metrics and halves the memory traffic
+data = df[metrics].astype(np.float32)
 
-# Resample to 1-minute intervals using mean, only on numeric data
-data = data.resample('1min').mean().interpolate()
+# Resample to 1-minute intervals using mean, only on numeric data: sum
+# each minute's rows in one pass, then interpolate the empty minutes
+minute = data.index.to_numpy().astype('datetime64[m]').astype(np.int64)
+keys, starts = np.unique(minute, return_index=True)
+values = data.to_numpy()
+present = ~np.isnan(values)
+sums = np.add.reduceat(np.where(present, values, 0.0), starts, axis=0)
+counts = np.add.reduceat(present, starts, axis=0)
+with np.errstate(invalid='ignore'):
+    means = sums / counts
+full_range = np.arange(keys[0], keys[-1] + 1)
+resampled = np.empty((len(full_range), len(metrics)), dtype=np.float32)
+for col in range(len(metrics)):
+    known = ~np.isnan(means[:, col])
+    resampled[:, col] = np.interp(full_range, keys[known], means[known, col])
+data = pd.DataFrame(
+    resampled,
+    columns=metrics,
+    index=pd.DatetimeIndex(full_range.astype('datetime64[m]'), name=data.index.name, freq='1min'),
+)
 
-# 1️⃣ Truncated SVD Denoising
-svd = TruncatedSVD(n_components=2)
-reduced = svd.fit_transform(data)
-reconstructed = svd.inverse_transform(reduced)
+# 1️⃣ Truncated SVD Denoising (rank-2 reconstruction of the centered data)
+X = data.to_numpy()
+mean = X.mean(axis=0)
+U, S, Vt = np.linalg.svd(X - mean, full_matrices=False)
+reconstructed = (U[:, :2] * S[:2]) @ Vt[:2] + mean
 df_reconstructed = pd.DataFrame(reconstructed, columns=metrics, index=data.index)
 
 # 2️⃣ ARIMA Forecasting
 forecast_horizon = 3
-forecast_results = {}
 
-for metric in metrics:
-    series = df_reconstructed[metric]
+# Fitted models are cached per metric with a hash of the raw resampled
+# series they were fitted on. The SVD reconstruction of earlier minutes
+# shifts whenever rows are added, so the raw series is what identifies the
+# history; a later run whose raw series extends it appends the new
+# reconstructed observations instead of refitting. The last cached minute
+# may still have been filling up, so it is left out of the hash.
+ARIMA_CACHE_DIR = "arima_cache"
+os.makedirs(ARIMA_CACHE_DIR, exist_ok=True)
+
+def _series_digest(series):
+    return hashlib.sha256(pd.util.hash_pandas_object(series).to_numpy().tobytes()).hexdigest()
+
+def _load_cached_fit(path):
+    """The cached entry for a metric, or None if it is missing or unreadable"""
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Ignoring unreadable ARIMA cache {path}: {e}")
+        return None
+
+def _save_cached_fit(path, entry):
+    """Write the entry to a temporary file and move it into place, so a crash never leaves a partial cache"""
+    fd, tmp_path = tempfile.mkstemp(dir=ARIMA_CACHE_DIR, suffix='.tmp')
     try:
-        model = ARIMA(series, order=(2, 1, 2))
-        model_fit = model.fit()
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(entry, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def _fit_arima(metric, series, raw):
+    path = os.path.join(ARIMA_CACHE_DIR, f"{metric}.pkl")
+    cached = _load_cached_fit(path)
+    model_fit = None
+    start_params = None
+    if cached is not None:
+        try:
+            nobs = cached['nobs']
+            if len(raw) >= nobs and _series_digest(raw[:nobs - 1]) == cached['digest']:
+                model_fit = cached['model_fit']
+                if len(series) > nobs:
+                    model_fit = model_fit.append(series[nobs:], refit=False)
+            else:
+                # Start the optimizer from the previous fit
+                start_params = cached['model_fit'].params
+        except Exception as e:
+            print(f"Ignoring unusable ARIMA cache for {metric}: {e}")
+            model_fit = None
+            start_params = None
+    
+    try:
+        if model_fit is None:
+            model = ARIMA(series, order=(2, 1, 2))
+            model_fit = model.fit(start_params=start_params)
         forecast = model_fit.forecast(steps=forecast_horizon)
-        forecast_results[metric] = forecast
     except Exception as e:
         print(f"ARIMA failed for {metric}: {e}")
-        forecast_results[metric] = [np.nan] * forecast_horizon
+        return metric, [np.nan] * forecast_horizon
+    
+    try:
+        _save_cached_fit(path, {
+            'nobs': len(series),
+            'digest': _series_digest(raw[:len(series) - 1]),
+            'model_fit': model_fit
+        })
+    except Exception as e:
+        print(f"Could not cache the ARIMA fit for {metric}: {e}")
+    return metric, forecast
+
+# The per-metric fits are independent, so run them in separate processes
+results = Parallel(n_jobs=len(metrics), backend='loky')(
+    delayed(_fit_arima)(metric, df_reconstructed[metric], data[metric]) for metric in metrics
+)
+forecast_results = dict(results)
 
 # Create forecast DataFrame
 forecast_df = pd.DataFrame(forecast_results)
 forecast_df.index = pd.date_range(start=df_reconstructed.index[-1], periods=forecast_horizon + 1, freq='1min')[1:]
 
 # 3️⃣ QoS Classification
-def classify_qos(row):
-    if row['latency'] < 50 and row['rssi'] > -60 and row['packet_loss'] < 1 and row['throughput'] > 100:
-        return "High"
-    elif row['latency'] > 150 or row['packet_loss'] > 5 or row['throughput'] < 30:
-        return "Low"
-    else:
-        return "Medium"
-
-forecast_df['QoS'] = forecast_df.apply(classify_qos, axis=1)
+def classify_qos(frame):
+    lat = frame['latency'].to_numpy()
+    rssi = frame['rssi'].to_numpy()
+    pl = frame['packet_loss'].to_numpy()
+    tp = frame['throughput'].to_numpy()
+    high = (lat < 50) & (rssi > -60) & (pl < 1) & (tp > 100)
+    low = (lat > 150) | (pl > 5) | (tp < 30)
+    return np.select([high, low], ["High", "Low"], default="Medium")
+
+forecast_df['QoS'] = classify_qos(forecast_df)
 
 # 4️⃣ Display Forecast
 print("QoS Forecast for Next 3 Minutes:")